@@ -1,47 +1,58 @@
 import os
 import sys
-import glob
-import json
+import heapq
 import subprocess
 from pathlib import Path
 
+# Make the project root importable so `tests.compare_dxf` resolves when this
+# script is run as `python scripts/para_ops.py`.
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+def import_compare_dxf():
+    """Imports the shared DXF comparison module, or returns None if it is unavailable."""
+    try:
+        from tests import compare_dxf
+    except ImportError as e:
+        print(f"Error: Could not import tests.compare_dxf: {e}")
+        return None
+    return compare_dxf
+
 def debug_dxf_shapes(dxf_path):
     """Parses a DXF file using the test tools and prints the largest shapes by area."""
-    try:
-        from tests.compare_dxf import parse_shapes
-    except ImportError:
-        print("Error: Could not import tests.compare_dxf. Ensure you are running from the project root.")
+    compare_dxf = import_compare_dxf()
+    if compare_dxf is None:
         return
 
     if not os.path.exists(dxf_path):
         print(f"Error: File {dxf_path} not found.")
         return
 
-    shapes = parse_shapes(dxf_path)
-    shapes.sort(key=lambda s: s["area"], reverse=True)
+    shapes = compare_dxf.parse_shapes(dxf_path)
+    top = heapq.nlargest(20, shapes, key=lambda s: s["area"])
     
     print(f"Top 20 largest shapes in {dxf_path}:")
-    for i, s in enumerate(shapes[:20]):
+    for i, s in enumerate(top):
         print(f"{i+1}. {s['type']} - {s['width']:.2f}x{s['height']:.2f} = Area {s['area']:.2f} (Layer: {s['layer']}, Points: {s['num_pts']})")
 
-    shapes.sort(key=lambda s: s["width"])
+    # Narrowest first; equal widths keep largest-area-first order
+    slot_candidates = [s for s in shapes if s['width'] < 20 and s['has_bulge']]
+    slots = heapq.nsmallest(16, slot_candidates, key=lambda s: (s["width"], -s["area"]))
     print(f"\nPotential Slots by dimension in {dxf_path}:")
-    count = 0
-    for s in shapes:
-        if s['width'] < 20 and s['has_bulge']:
-            print(f"Slot? {s['type']} - min(W,H):{min(s['width'], s['height']):.2f}x{max(s['width'], s['height']):.2f} = Area {s['area']:.2f} (Bulge: {s['has_bulge']})")
-            count += 1
-            if count > 15:
-                print("... (showing first 15)")
-                break
+    for count, s in enumerate(slots, 1):
+        print(f"Slot? {s['type']} - min(W,H):{min(s['width'], s['height']):.2f}x{max(s['width'], s['height']):.2f} = Area {s['area']:.2f} (Bulge: {s['has_bulge']})")
+        if count > 15:
+            print("... (showing first 15)")
 
 def get_latest_dxf(output_dir='test-output', prefix='accuracy-'):
     """Finds the latest DXF file in the test output directory."""
-    search_pattern = os.path.join(output_dir, f'{prefix}*.dxf')
-    files = glob.glob(search_pattern)
-    if not files:
+    try:
+        with os.scandir(output_dir) as it:
+            # DirEntry caches its stat result, so each file is stat'ed once
+            latest = max((e for e in it if e.name.startswith(prefix) and e.name.endswith('.dxf')),
+                         key=lambda e: e.stat().st_mtime, default=None)
+    except FileNotFoundError:
         return None
-    return max(files, key=os.path.getmtime)
+    return latest.path if latest else None
 
 def run_dxf_tests():
     """Runs the Playwright DXF accuracy tests."""
@@ -75,19 +86,15 @@ def check_dxf_score():
     print(f"Comparing generated DXF: {latest_dxf}")
     print(f"Against reference DXF: {reference_dxf}")
     
-    cmd = [sys.executable, "tests/compare_dxf.py", latest_dxf, reference_dxf]
-    result = subprocess.run(cmd, capture_output=True, text=True)
-    
-    if result.returncode != 0:
-        print("Error running compare_dxf.py:")
-        print(result.stderr)
+    compare_dxf = import_compare_dxf()
+    if compare_dxf is None:
         sys.exit(1)
 
     try:
-        metrics = json.loads(result.stdout)
-    except json.JSONDecodeError:
-        print("Failed to parse JSON output from compare_dxf.py:")
-        print(result.stdout)
+        metrics = compare_dxf.compare_dxfs(latest_dxf, reference_dxf)
+    except (OSError, compare_dxf.ezdxf.DXFError) as e:
+        print("Error running compare_dxf.py:")
+        print(e)
         sys.exit(1)
 
     print("\n" + "="*40)
@@ -1,6 +1,10 @@
 """
 Compare a generated DXF against the reference CNC file.
-Usage: python tests/compare_dxf.py <generated.dxf> <reference.dxf>
+Usage: python tests/compare_dxf.py <generated.dxf> <reference.dxf> [--no-cache]
+
+The parsed reference shapes are cached next to the reference file
+(<reference.dxf>.shapes.pkl) and reused while its mtime and size are
+unchanged. Pass --no-cache to always re-parse.
 
 Outputs JSON metrics:
 - shape_count_match: bool
@@ -10,190 +14,382 @@ Outputs JSON metrics:
 - slot_dimensions_accuracy: 0-100%
 - overall_score: 0-100%
 """
+import os
 import sys
 import json
+import pickle
 import ezdxf
-from collections import defaultdict
+from ezdxf.addons import iterdxf
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+
+
+# Material thickness of the 12mm CNC sheets; slots are cut to this width
+SLOT_WIDTH = 12
+
+# Shape kinds assigned by shape_kinds()
+MARKER, SHEET, SLOT, RYB = 0, 1, 2, 3
+
+# Points awarded per criterion in overall_score; they sum to 100
+SCORE_WEIGHTS = {
+    'has_slots': 15,
+    'has_rybs': 15,
+    'has_backplane': 10,
+    'organic_backplane': 15,
+    'tabs': 15,
+    'ryb_count': 15,
+    'slot_count': 15,
+}
+
+# One record per grouped shape, as returned by parse_shapes()
+SHAPE_DTYPE = np.dtype([
+    ('type', object),
+    ('layer', object),
+    ('width', np.float64),
+    ('height', np.float64),
+    ('min_x', np.float64),
+    ('min_y', np.float64),
+    ('max_x', np.float64),
+    ('max_y', np.float64),
+    ('cx', np.float64),
+    ('cy', np.float64),
+    ('has_bulge', np.bool_),
+    ('area', np.float64),
+    ('num_pts', np.int64),
+])
+
+# One record per DXF entity before endpoint grouping; entity type and layer
+# strings are kept in parallel lists.
+_ENTITY_DTYPE = np.dtype([
+    ('endpoints', np.float64, (2, 2)),
+    ('bbox_min', np.float64, (2,)),
+    ('bbox_max', np.float64, (2,)),
+    ('has_bulge', np.bool_),
+    ('num_pts', np.int64),
+])
 
 
 class UnionFind:
-    def __init__(self):
-        self.parent = {}
-    
-    def find(self, i):
-        if self.parent.setdefault(i, i) == i:
-            return i
-        self.parent[i] = self.find(self.parent[i])
-        return self.parent[i]
-    
-    def union(self, i, j):
-        root_i = self.find(i)
-        root_j = self.find(j)
-        if root_i != root_j:
-            self.parent[root_i] = root_j
+    """Disjoint sets over the dense indices 0..n-1."""
+
+    def __init__(self, n):
+        self.parent = np.arange(n, dtype=np.int32)
+
+    def union_all(self, a, b):
+        """Union every pair (a[k], b[k]) by hooking larger roots onto smaller ones."""
+        while True:
+            parent = self.roots()
+            root_a, root_b = parent[a], parent[b]
+            split = root_a != root_b
+            if not split.any():
+                break
+            root_a, root_b = root_a[split], root_b[split]
+            np.minimum.at(parent, np.maximum(root_a, root_b), np.minimum(root_a, root_b))
+
+    def roots(self):
+        """Point every node directly at its root and return the parent array."""
+        parent = self.parent
+        while True:
+            grand = parent[parent]
+            if np.array_equal(grand, parent):
+                break
+            parent = grand
+        self.parent[:] = parent
+        return self.parent
+
+# Endpoints closer than this (mm, per axis) are treated as the same point
+ENDPOINT_TOLERANCE = 0.01
+
+# Adjacent grid cells to probe: the four cells "ahead" of a cell, so every
+# pair of adjacent cells is visited exactly once.
+_CELL_OFFSETS = ((0, 1), (1, -1), (1, 0), (1, 1))
+
+def match_endpoints(endpoints, tol=ENDPOINT_TOLERANCE):
+    """Return index pairs linking shapes whose endpoints lie within `tol` of each other.
+
+    `endpoints` is an (n, 2, 2) array holding each shape's first and last point.
+    The pairs are not exhaustive: unioning them gives the same groups as
+    unioning every pair of endpoints within `tol` on both axes, but at most
+    five pairs are emitted per endpoint.
 
-def pt_key(x, y):
-    return (round(x, 2), round(y, 2))
+    Points are bucketed into a grid of `tol`-sized cells. Points sharing a cell
+    are already within `tol` of each other, so chaining them in sorted order
+    connects the cell. For an adjacent cell it is enough to know whether *some*
+    point there is in range, which is answered from per-cell running extremes
+    and linked to that cell's first point. Everything is sorts and binary
+    searches, so the cost is O(n log n).
+    """
+    pts = endpoints.reshape(-1, 2)
+    owner = np.repeat(np.arange(len(endpoints)), 2)
+    cells = np.floor(pts / tol).astype(np.int64)
+    cells -= cells.min(axis=0) - 1  # keep neighbour offsets non-negative
+    stride = int(cells[:, 1].max()) + 2
+    keys = cells[:, 0] * stride + cells[:, 1]
+    order = np.lexsort((pts[:, 0], keys))  # by cell, then by x within a cell
+    keys, owner = keys[order], owner[order]
+    xs, ys = pts[order, 0], pts[order, 1]
+
+    same = keys[1:] == keys[:-1]
+    pairs_a, pairs_b = [owner[:-1][same]], [owner[1:][same]]
+
+    # Work on integer ranks so the per-cell searches and extremes are exact.
+    # Offsetting by run * span keeps each cell's run separate in the sorted
+    # position array and in the running min/max.
+    sorted_x, sorted_y = np.sort(xs), np.sort(ys)
+    span = len(xs) + 1
+    run = np.cumsum(np.r_[0, ~same])
+    x_pos = run * span + np.searchsorted(sorted_x, xs, side='left')
+    run_min_y = np.minimum.accumulate(np.searchsorted(sorted_y, ys, side='left') - run * span) + run * span
+    run_max_y = np.maximum.accumulate(np.searchsorted(sorted_y, ys, side='right') + run * span) - run * span
+
+    for dx, dy in _CELL_OFFSETS:
+        target = keys + dx * stride + dy
+        lo = np.searchsorted(keys, target, side='left')
+        hi = np.searchsorted(keys, target, side='right')
+        p = np.flatnonzero(hi > lo)
+        lo, hi = lo[p], hi[p]
+        if dx:
+            # Only the x-sorted prefix of the cell with x <= p.x + tol is in range
+            bound = np.searchsorted(sorted_x, xs[p] + tol, side='right')
+            cut = np.searchsorted(x_pos, run[lo] * span + bound, side='left')
+        else:
+            cut = hi
+        near = cut > lo
+        last = cut - 1
+        if dy > 0:
+            near &= run_min_y[last] < np.searchsorted(sorted_y, ys[p] + tol, side='right')
+        elif dy < 0:
+            near &= run_max_y[last] > np.searchsorted(sorted_y, ys[p] - tol, side='left')
+        pairs_a.append(owner[p[near]])
+        pairs_b.append(owner[lo[near]])
+
+    return np.concatenate(pairs_a), np.concatenate(pairs_b)
+
+# Entity handlers: each returns (pts, bbox_pts, bulges) for one DXF entity.
+# `pts` drives endpoint grouping, `bbox_pts` the extents.
+
+def _handle_polyline(e):
+    xyb = np.array([(v.dxf.location.x, v.dxf.location.y, v.dxf.get('bulge') or 0)
+                    for v in e.vertices], dtype=np.float64).reshape(-1, 3)
+    return xyb[:, :2], xyb[:, :2], xyb[:, 2]
+
+def _handle_lwpolyline(e):
+    xyb = np.asarray(e.get_points(format='xyb'), dtype=np.float64).reshape(-1, 3)
+    return xyb[:, :2], xyb[:, :2], xyb[:, 2]
+
+def _handle_line(e):
+    pts = [(e.dxf.start.x, e.dxf.start.y), (e.dxf.end.x, e.dxf.end.y)]
+    return pts, pts, []
+
+def _handle_circle(e):
+    cx, cy = e.dxf.center.x, e.dxf.center.y
+    r = e.dxf.radius
+    # Center for clustering
+    return [(cx, cy)], [(cx - r, cy - r), (cx + r, cy + r)], []
+
+def _handle_arc(e):
+    sp = e.start_point
+    ep = e.end_point
+    cx, cy = e.dxf.center.x, e.dxf.center.y
+    r = e.dxf.radius
+    return [(sp.x, sp.y), (ep.x, ep.y)], [(cx - r, cy - r), (cx + r, cy + r)], [1.0]
+
+def _handle_ellipse(e):
+    cx, cy = e.dxf.center.x, e.dxf.center.y
+    return [(cx, cy)], [(cx, cy)], []
+
+_ENTITY_HANDLERS = {
+    'POLYLINE': _handle_polyline,
+    'LWPOLYLINE': _handle_lwpolyline,
+    'LINE': _handle_line,
+    'CIRCLE': _handle_circle,
+    'ARC': _handle_arc,
+    'ELLIPSE': _handle_ellipse,
+}
+
+def _iter_modelspace(filepath):
+    """Yield modelspace entities, streamed from disk instead of loading the whole document."""
+    try:
+        doc = iterdxf.opendxf(filepath)
+    except ezdxf.DXFStructureError:
+        # iterdxf needs a well-formed file; let the full loader (and its errors) handle the rest
+        try:
+            doc = ezdxf.readfile(filepath)
+        except StopIteration:
+            # ezdxf runs off the end of a file truncated inside its header
+            raise ezdxf.DXFStructureError(f"File '{filepath}' is truncated.") from None
+        yield from doc.modelspace()
+        return
+    try:
+        yield from doc.modelspace()
+    finally:
+        doc.close()
 
 def parse_shapes(filepath):
-    """Parse a DXF and return shape descriptors."""
-    doc = ezdxf.readfile(filepath)
-    msp = doc.modelspace()
+    """Parse a DXF and return a SHAPE_DTYPE record array of shape descriptors."""
+    msp = _iter_modelspace(filepath)
     
-    raw_shapes = []
+    rows = []
+    types = []
+    layers = []
     for e in msp:
         dtype = e.dxftype()
-        if dtype not in ('POLYLINE', 'LWPOLYLINE', 'LINE', 'CIRCLE', 'ARC', 'ELLIPSE'):
+        handler = _ENTITY_HANDLERS.get(dtype)
+        if handler is None:
             continue
         
-        pts = []
-        bbox_pts = []
-        bulges = []
-        
-        if dtype == 'POLYLINE':
-            for v in e.vertices:
-                loc = v.dxf.location
-                pts.append((loc.x, loc.y))
-                bbox_pts.append((loc.x, loc.y))
-                b = v.dxf.bulge if hasattr(v.dxf, 'bulge') and v.dxf.bulge is not None else 0
-                bulges.append(b)
-        elif dtype == 'LWPOLYLINE':
-            for row in e.get_points(format='xyseb'):
-                pts.append((row[0], row[1]))
-                bbox_pts.append((row[0], row[1]))
-                bulges.append(row[4])
-        elif dtype == 'LINE':
-            pts.append((e.dxf.start.x, e.dxf.start.y))
-            pts.append((e.dxf.end.x, e.dxf.end.y))
-            bbox_pts = pts[:]
-        elif dtype == 'CIRCLE':
-            cx, cy = e.dxf.center.x, e.dxf.center.y
-            r = e.dxf.radius
-            pts = [(cx, cy)] # Center for clustering
-            bbox_pts = [(cx - r, cy - r), (cx + r, cy + r)]
-        elif dtype == 'ARC':
-            sp = e.start_point
-            ep = e.end_point
-            pts = [(sp.x, sp.y), (ep.x, ep.y)]
-            cx, cy = e.dxf.center.x, e.dxf.center.y
-            r = e.dxf.radius
-            bbox_pts = [(cx - r, cy - r), (cx + r, cy + r)]
-            bulges = [1.0]
-        elif dtype == 'ELLIPSE':
-            cx, cy = e.dxf.center.x, e.dxf.center.y
-            pts = [(cx, cy)]
-            bbox_pts = [(cx, cy)]
-        
-        if not pts:
+        pts, bbox_pts, bulges = handler(e)
+        if len(pts) == 0:
             continue
-            
-        raw_shapes.append({
-            'type': dtype,
-            'pts': pts,
-            'bbox_pts': bbox_pts,
-            'bulges': bulges,
-            'layer': e.dxf.layer if hasattr(e.dxf, 'layer') else '0'
-        })
-        
-    uf = UnionFind()
-    point_map = {}
-    
-    for i, s in enumerate(raw_shapes):
-        if len(s['pts']) == 0: continue
-        p1 = pt_key(s['pts'][0][0], s['pts'][0][1])
-        p2 = pt_key(s['pts'][-1][0], s['pts'][-1][1])
-        
-        for p in (p1, p2):
-            if p in point_map:
-                uf.union(i, point_map[p])
-            point_map[p] = i
-
-    groups = defaultdict(list)
-    for i in range(len(raw_shapes)):
-        groups[uf.find(i)].append(raw_shapes[i])
-        
-    shapes = []
-    for g_id, sub_shapes in groups.items():
-        all_xs = []
-        all_ys = []
-        total_pts = 0
-        has_bulge = False
-        
-        for s in sub_shapes:
-            all_xs.extend([p[0] for p in s['bbox_pts']])
-            all_ys.extend([p[1] for p in s['bbox_pts']])
-            total_pts += len(s['pts'])
-            if any(abs(b) > 0.001 for b in s['bulges']):
-                has_bulge = True
-
-        if not all_xs: continue
-        min_x, max_x = min(all_xs), max(all_xs)
-        min_y, max_y = min(all_ys), max(all_ys)
-        w = max_x - min_x
-        h = max_y - min_y
-        main_type = 'POLYLINE' if len(sub_shapes) > 1 else sub_shapes[0]['type']
+
+        pts = np.asarray(pts, dtype=np.float64).reshape(-1, 2)
+        bbox_arr = np.asarray(bbox_pts, dtype=np.float64).reshape(-1, 2)
+        bulge_arr = np.asarray(bulges, dtype=np.float64)
+        rows.append(((pts[0], pts[-1]),
+                     bbox_arr.min(axis=0),
+                     bbox_arr.max(axis=0),
+                     np.any(np.abs(bulge_arr) > 0.001),
+                     len(pts)))
+        types.append(dtype)
+        layers.append(e.dxf.get('layer', '0'))
         
-        shapes.append({
-            'type': main_type,
-            'layer': sub_shapes[0]['layer'],
-            'width': round(w, 2),
-            'height': round(h, 2),
-            'min_x': round(min_x, 2),
-            'min_y': round(min_y, 2),
-            'max_x': round(max_x, 2),
-            'max_y': round(max_y, 2),
-            'cx': round((min_x + max_x) / 2, 2),
-            'cy': round((min_y + max_y) / 2, 2),
-            'has_bulge': has_bulge,
-            'area': round(w * h, 1),
-            'num_pts': total_pts,
-        })
-    
+    n = len(rows)
+    if n == 0:
+        return np.recarray(0, dtype=SHAPE_DTYPE)
+
+    entities = np.array(rows, dtype=_ENTITY_DTYPE)
+    uf = UnionFind(n)
+    uf.union_all(*match_endpoints(entities['endpoints']))
+
+    # Label each shape with its group, numbering groups by their first member
+    # so the output keeps drawing order.
+    _, first, inverse = np.unique(uf.roots(), return_index=True, return_inverse=True)
+    group_rank = np.empty(len(first), dtype=np.int64)
+    group_rank[np.argsort(first)] = np.arange(len(first))
+    group_of = group_rank[inverse.ravel()]
+
+    # Scatter each entity's bbox corners into its group's extents: O(entities),
+    # touching only the two stored corners per entity rather than its vertices.
+    n_groups = len(first)
+    g_min = np.full((n_groups, 2), np.inf)
+    g_max = np.full((n_groups, 2), -np.inf)
+    np.minimum.at(g_min, group_of, entities['bbox_min'])
+    np.maximum.at(g_max, group_of, entities['bbox_max'])
+    g_bulge = np.bincount(group_of, weights=entities['has_bulge'], minlength=n_groups) > 0
+    g_pts = np.bincount(group_of, weights=entities['num_pts'], minlength=n_groups).astype(np.int64)
+    g_size = np.bincount(group_of, minlength=n_groups)
+    g_first = np.sort(first)
+
+    shapes = np.recarray(n_groups, dtype=SHAPE_DTYPE)
+    shapes.type = ['POLYLINE' if size > 1 else types[i]
+                   for size, i in zip(g_size, g_first)]
+    shapes.layer = [layers[i] for i in g_first]
+    w = g_max[:, 0] - g_min[:, 0]
+    h = g_max[:, 1] - g_min[:, 1]
+    shapes.width = np.round(w, 2)
+    shapes.height = np.round(h, 2)
+    shapes.min_x = np.round(g_min[:, 0], 2)
+    shapes.min_y = np.round(g_min[:, 1], 2)
+    shapes.max_x = np.round(g_max[:, 0], 2)
+    shapes.max_y = np.round(g_max[:, 1], 2)
+    shapes.cx = np.round((g_min[:, 0] + g_max[:, 0]) / 2, 2)
+    shapes.cy = np.round((g_min[:, 1] + g_max[:, 1]) / 2, 2)
+    shapes.has_bulge = g_bulge
+    shapes.area = np.round(w * h, 1)
+    shapes.num_pts = g_pts
+
     return shapes
 
 
-def classify_shapes(shapes):
-    """Classify shapes into sheets, rybs, slots, and markers."""
-    sheets = [s for s in shapes if s['width'] > 1000 and s['height'] > 2000]
+# Bump whenever parse_shapes() would produce different shapes for the same
+# file (handlers, grouping, ENDPOINT_TOLERANCE, SHAPE_DTYPE, ...) so stale
+# caches are re-parsed instead of silently reused.
+_CACHE_VERSION = 1
+
+def _cache_key(filepath):
+    stat = os.stat(filepath)
+    return (_CACHE_VERSION, stat.st_mtime_ns, stat.st_size)
+
+
+def cached_shapes(filepath):
+    """Return the cached shapes for `filepath`, or None if missing or stale."""
+    # Best effort: any unreadable, foreign or outdated cache (e.g. one pickled
+    # under another NumPy version) just means a re-parse.
+    try:
+        with open(filepath + '.shapes.pkl', 'rb') as f:
+            cached_key, shapes = pickle.load(f)
+        if cached_key == _cache_key(filepath) and shapes.dtype == SHAPE_DTYPE:
+            return shapes
+    except Exception:
+        pass
+    return None
+
+
+def load_shapes(filepath, use_cache=True):
+    """parse_shapes() backed by a pickle cache keyed on the file's mtime and size."""
+    if not use_cache:
+        return parse_shapes(filepath)
+
+    shapes = cached_shapes(filepath)
+    if shapes is not None:
+        return shapes
+
+    key = _cache_key(filepath)
+    shapes = parse_shapes(filepath)
+    try:
+        with open(filepath + '.shapes.pkl', 'wb') as f:
+            pickle.dump((key, shapes), f, protocol=pickle.HIGHEST_PROTOCOL)
+    except OSError:
+        pass  # read-only checkout; just skip caching
+    return shapes
+
+
+def shape_kinds(shapes):
+    """Label every shape as SHEET, SLOT, RYB or MARKER in a single pass.
+
+    Rules are tried in that order, so a shape matching several gets the first.
+    """
+    w, h, area = shapes.width, shapes.height, shapes.area
+    sheet_mask = (w > 1000) & (h > 2000)
     
-    # Slots: narrow shapes (one dimension ~12mm) with bulge
-    slots = [s for s in shapes 
-             if (abs(s['width'] - 12) < 5 or abs(s['height'] - 12) < 5)
-             and s['has_bulge']
-             and s['area'] < 10000]
+    # Slots: narrow shapes (one dimension ~SLOT_WIDTH) with bulge
+    slot_mask = (((np.abs(w - SLOT_WIDTH) < 5) | (np.abs(h - SLOT_WIDTH) < 5))
+                 & shapes.has_bulge
+                 & (area < 10000))
     
     # Ryb profiles: medium shapes not in sheets or slots
-    slot_set = set(id(s) for s in slots)
-    sheet_set = set(id(s) for s in sheets)
-    rybs = [s for s in shapes 
-            if id(s) not in slot_set 
-            and id(s) not in sheet_set
-            and s['area'] > 100  # minimum area
-            and s['width'] > 20 and s['height'] > 20]
+    ryb_mask = (area > 100) & (w > 20) & (h > 20)  # minimum area
     
+    return np.select([sheet_mask, slot_mask, ryb_mask],
+                     [SHEET, SLOT, RYB], MARKER).astype(np.int8)
+
+
+def classify_shapes(shapes):
+    """Classify shapes into sheets, rybs, slots, and markers."""
+    kinds = shape_kinds(shapes)
     return {
-        'sheets': sheets,
-        'rybs': rybs,
-        'slots': slots,
+        'sheets': shapes[kinds == SHEET],
+        'rybs': shapes[kinds == RYB],
+        'slots': shapes[kinds == SLOT],
         'total': len(shapes),
     }
 
 
 def compute_bounding_box_overlap(shapes_a, shapes_b):
     """Compute how well the bounding boxes of two shape sets overlap."""
-    if not shapes_a or not shapes_b:
+    if len(shapes_a) == 0 or len(shapes_b) == 0:
         return 0.0
     
     # Overall bounding box
-    all_a_min_x = min(s['min_x'] for s in shapes_a)
-    all_a_max_x = max(s['max_x'] for s in shapes_a)
-    all_a_min_y = min(s['min_y'] for s in shapes_a)
-    all_a_max_y = max(s['max_y'] for s in shapes_a)
+    all_a_min_x = float(shapes_a.min_x.min())
+    all_a_max_x = float(shapes_a.max_x.max())
+    all_a_min_y = float(shapes_a.min_y.min())
+    all_a_max_y = float(shapes_a.max_y.max())
     
-    all_b_min_x = min(s['min_x'] for s in shapes_b)
-    all_b_max_x = max(s['max_x'] for s in shapes_b)
-    all_b_min_y = min(s['min_y'] for s in shapes_b)
-    all_b_max_y = max(s['max_y'] for s in shapes_b)
+    all_b_min_x = float(shapes_b.min_x.min())
+    all_b_max_x = float(shapes_b.max_x.max())
+    all_b_min_y = float(shapes_b.min_y.min())
+    all_b_max_y = float(shapes_b.max_y.max())
     
     # Overlap rectangle
     ox1 = max(all_a_min_x, all_b_min_x)
@@ -212,13 +408,26 @@ def compute_bounding_box_overlap(shapes_a, shapes_b):
     return round(overlap / max(union, 1) * 100, 1)
 
 
-def compare_dxfs(generated_path, reference_path):
-    """Compare two DXF files and return accuracy metrics."""
-    gen_shapes = parse_shapes(generated_path)
-    ref_shapes = parse_shapes(reference_path)
+def compare_dxfs(generated_path, reference_path, use_cache=True):
+    """Compare two DXF files and return accuracy metrics.
+
+    The reference file rarely changes, so its parsed shapes are cached
+    unless `use_cache` is False.
+    """
+    ref_shapes = cached_shapes(reference_path) if use_cache else None
+    if ref_shapes is not None:
+        gen_shapes = parse_shapes(generated_path)
+    else:
+        # Parsing is pure Python and GIL-bound, so use processes, not threads
+        with ProcessPoolExecutor(max_workers=2) as pool:
+            gen_future = pool.submit(parse_shapes, generated_path)
+            ref_future = pool.submit(load_shapes, reference_path, use_cache)
+            gen_shapes, ref_shapes = gen_future.result(), ref_future.result()
     
     gen_classified = classify_shapes(gen_shapes)
     ref_classified = classify_shapes(ref_shapes)
+    gen_rybs, ref_rybs = gen_classified['rybs'], ref_classified['rybs']
+    gen_large, ref_large = gen_rybs.area > 500000, ref_rybs.area > 500000
     
     metrics = {
         'generated_path': generated_path,
@@ -238,14 +447,14 @@ def compare_dxfs(generated_path, reference_path):
         'sheet_count_generated': len(gen_classified['sheets']),
         'sheet_count_reference': len(ref_classified['sheets']),
         
-        'has_backplane_generated': any(s['area'] > 500000 for s in gen_classified['rybs']),
-        'has_backplane_reference': any(s['area'] > 500000 for s in ref_classified['rybs']),
+        'has_backplane_generated': bool(gen_large.any()),
+        'has_backplane_reference': bool(ref_large.any()),
         
-        'is_backplane_organic_generated': any(s['area'] > 500000 and s['num_pts'] > 50 for s in gen_classified['rybs']),
-        'is_backplane_organic_reference': any(s['area'] > 500000 and s['num_pts'] > 50 for s in ref_classified['rybs']),
+        'is_backplane_organic_generated': bool((gen_large & (gen_rybs.num_pts > 50)).any()),
+        'is_backplane_organic_reference': bool((ref_large & (ref_rybs.num_pts > 50)).any()),
         
-        'rybs_with_tabs_generated': sum(1 for s in gen_classified['rybs'] if s['area'] < 500000 and s['num_pts'] >= 8),
-        'rybs_with_tabs_reference': sum(1 for s in ref_classified['rybs'] if s['area'] < 500000 and s['num_pts'] >= 8),
+        'rybs_with_tabs_generated': int(np.count_nonzero((gen_rybs.area < 500000) & (gen_rybs.num_pts >= 8))),
+        'rybs_with_tabs_reference': int(np.count_nonzero((ref_rybs.area < 500000) & (ref_rybs.num_pts >= 8))),
         
         'bounding_box_overlap_rybs': compute_bounding_box_overlap(
             gen_classified['rybs'], ref_classified['rybs']),
@@ -253,41 +462,41 @@ def compare_dxfs(generated_path, reference_path):
             gen_classified['slots'], ref_classified['slots']),
     }
     
-    # Size distribution similarity
-    gen_sizes = sorted([round(s['area'], -2) for s in gen_classified['rybs']])
-    ref_sizes = sorted([round(s['area'], -2) for s in ref_classified['rybs']])
+    # Size distribution similarity (areas bucketed to the nearest 100mm^2)
+    gen_sizes = np.unique(np.round(gen_rybs.area, -2))
+    ref_sizes = np.unique(np.round(ref_rybs.area, -2))
     
-    if gen_sizes and ref_sizes:
+    if gen_sizes.size and ref_sizes.size:
         # Compare size distributions (how many unique sizes match)
-        gen_set = set(gen_sizes)
-        ref_set = set(ref_sizes)
-        common = len(gen_set & ref_set)
-        total = len(gen_set | ref_set)
+        common = np.intersect1d(gen_sizes, ref_sizes, assume_unique=True).size
+        total = gen_sizes.size + ref_sizes.size - common
         metrics['size_distribution_match'] = round(common / max(total, 1) * 100, 1)
     else:
         metrics['size_distribution_match'] = 0.0
     
     # Slot dimension accuracy
-    if gen_classified['slots'] and ref_classified['slots']:
+    gen_slots, ref_slots = gen_classified['slots'], ref_classified['slots']
+    if len(gen_slots) and len(ref_slots):
         # Check if slot widths are consistent (should all be ~12mm)
         # Use min(width, height) to account for rotation/orientation
-        gen_consistent = all(abs(min(s['width'], s['height']) - 12) < 3 for s in gen_classified['slots'])
-        ref_consistent = all(abs(min(s['width'], s['height']) - 12) < 3 for s in ref_classified['slots'])
-        metrics['slot_width_consistency'] = gen_consistent and ref_consistent
+        gen_consistent = np.all(np.abs(np.minimum(gen_slots.width, gen_slots.height) - SLOT_WIDTH) < 3)
+        ref_consistent = np.all(np.abs(np.minimum(ref_slots.width, ref_slots.height) - SLOT_WIDTH) < 3)
+        metrics['slot_width_consistency'] = bool(gen_consistent and ref_consistent)
     else:
         metrics['slot_width_consistency'] = False
     
     # Overall score (weighted combination)
-    has_slots = 15 if metrics['slot_count_generated'] > 0 else 0
-    has_rybs = 15 if metrics['ryb_count_generated'] > 0 else 0
-    has_backplane = 10 if metrics['has_backplane_generated'] else 0
+    wt = SCORE_WEIGHTS
+    has_slots = wt['has_slots'] if metrics['slot_count_generated'] > 0 else 0
+    has_rybs = wt['has_rybs'] if metrics['ryb_count_generated'] > 0 else 0
+    has_backplane = wt['has_backplane'] if metrics['has_backplane_generated'] else 0
     
     # New organic metrics
-    organic_bp_score = 15 if metrics['is_backplane_organic_generated'] else 0
-    tabs_score = 15 if metrics['rybs_with_tabs_generated'] >= min(metrics['ryb_count_reference'], 10) else 0
+    organic_bp_score = wt['organic_backplane'] if metrics['is_backplane_organic_generated'] else 0
+    tabs_score = wt['tabs'] if metrics['rybs_with_tabs_generated'] >= min(metrics['ryb_count_reference'], 10) else 0
     
-    ryb_count_score = min(15, 15 * min(metrics['ryb_count_generated'], metrics['ryb_count_reference']) / max(metrics['ryb_count_reference'], 1))
-    slot_score = min(15, 15 * min(metrics['slot_count_generated'], metrics['slot_count_reference']) / max(metrics['slot_count_reference'], 1))
+    ryb_count_score = min(wt['ryb_count'], wt['ryb_count'] * min(metrics['ryb_count_generated'], metrics['ryb_count_reference']) / max(metrics['ryb_count_reference'], 1))
+    slot_score = min(wt['slot_count'], wt['slot_count'] * min(metrics['slot_count_generated'], metrics['slot_count_reference']) / max(metrics['slot_count_reference'], 1))
     
     metrics['overall_score'] = round(has_slots + has_rybs + has_backplane + organic_bp_score + tabs_score + ryb_count_score + slot_score, 1)
     
@@ -295,9 +504,10 @@ def compare_dxfs(generated_path, reference_path):
 
 
 if __name__ == '__main__':
-    if len(sys.argv) < 3:
-        print("Usage: python compare_dxf.py <generated.dxf> <reference.dxf>")
+    args = [a for a in sys.argv[1:] if a != '--no-cache']
+    if len(args) < 2:
+        print("Usage: python compare_dxf.py <generated.dxf> <reference.dxf> [--no-cache]")
         sys.exit(1)
     
-    result = compare_dxfs(sys.argv[1], sys.argv[2])
+    result = compare_dxfs(args[0], args[1], use_cache='--no-cache' not in sys.argv)
     print(json.dumps(result, indent=2))